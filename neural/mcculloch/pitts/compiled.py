@@ -0,0 +1,231 @@
+# McCulloch-Pitts neuron model
+#
+# Evan Leis, 2015
+
+# Flattened, index-addressed form of a `model.Network`.
+#
+# Every node of the network gets a slot, in the order the network evaluates
+# them. Neurons reference their inputs by slot, so evaluating the network only
+# needs a flat list of values. The topology and weights are captured once
+# during compilation; the `model` objects are never modified.
+#
+# States live in `State` buffers owned by the caller rather than on the nodes,
+# so a single compiled network can be evaluated from any number of threads at
+# once, each with its own buffer.
+#
+# Packed evaluation stores one value per bit ("lane") of a Python integer,
+# evaluating as many input vectors as there are lanes with a handful of
+# bitwise operations per neuron. The sum-of-products covers it needs may grow
+# exponentially with the number of inputs of a neuron, so they are only built
+# the first time a packed evaluation asks for them.
+
+import threading
+
+from neural.mcculloch.pitts import model
+
+
+def cover(weights, threshold):
+    """
+    Sum-of-products cover of a threshold function.
+
+    Returns a list of `(on, off)` index tuples: the neuron fires iff, for any
+    term, every input in `on` is 1 and every input in `off` is 0.
+
+    Inputs are assigned one at a time, cutting the search short as soon as the
+    remaining weights can no longer change the outcome, so simple gates compile
+    to one or two terms.
+    """
+    count = len(weights)
+    high = [0] * (count + 1)
+    low = [0] * (count + 1)
+    for index in reversed(xrange(count)):
+        high[index] = high[index + 1] + max(weights[index], 0)
+        low[index] = low[index + 1] + min(weights[index], 0)
+
+    terms = []
+
+    def expand(index, partial, on, off):
+        if partial + low[index] >= threshold:
+            terms.append((on, off))
+        elif partial + high[index] < threshold:
+            return
+        elif weights[index] == 0:
+            expand(index + 1, partial, on, off)
+        else:
+            expand(index + 1, partial + weights[index], on + (index,), off)
+            expand(index + 1, partial, on, off + (index,))
+
+    expand(0, 0, (), ())
+    return terms
+
+
+class CompiledNetwork(object):
+    """
+    Immutable, slot-addressed snapshot of a `model.Network`.
+
+    `compiled.names` input names, in evaluation order
+    `compiled.slots` maps input names to slots
+    `compiled.gates` `(slot, sources, weights, threshold)` per neuron, in
+    evaluation order
+    `compiled.covers` `(slot, cover)` per neuron, built on first use
+    `compiled.outputs` slots of the network outputs
+    `compiled.initial` node states at the time of compilation
+
+    Weights and states are read during compilation; retrain or rewire the
+    network and it must be compiled again.
+
+    A compiled network is never modified after construction: `update` and
+    `evaluate_packed` keep states in buffers given by the caller, and may be
+    used from several threads at once as long as each uses its own buffer.
+    """
+
+    def __init__(self, network):
+        self.nodes = tuple(network)
+        self._positions = index = dict(
+            (id(node), slot) for slot, node in enumerate(self.nodes))
+        self.slots = {}
+        names = []
+        gates = []
+        for slot, node in enumerate(self.nodes):
+            if isinstance(node, model.Neuron):
+                sources = tuple(index[id(input)] for input in node.inputs)
+                gates.append((slot, sources, tuple(node.weights),
+                              node.threshold))
+            elif isinstance(node, model.Input):
+                names.append(node.name)
+                self.slots[node.name] = slot
+        self.names = tuple(names)
+        self.gates = tuple(gates)
+        self._covers = None
+        self.outputs = tuple(index[id(output)] for output in network.outputs)
+        self.initial = tuple(node.state for node in self.nodes)
+        self._local = threading.local()
+
+    def __len__(self):
+        return len(self.nodes)
+
+    @property
+    def covers(self):
+        # threads racing here build equal covers, whichever is kept
+        if self._covers is None:
+            self._covers = tuple(
+                (slot, tuple((tuple(sources[i] for i in on),
+                              tuple(sources[i] for i in off))
+                             for on, off in cover(weights, threshold)))
+                for slot, sources, weights, threshold in self.gates)
+        return self._covers
+
+    def index(self, node):
+        """
+        Slot of a node, or of an input by name.
+        """
+        if isinstance(node, basestring):
+            return self.slots[node]
+        try:
+            return self._positions[id(node)]
+        except KeyError:
+            raise KeyError(node)
+
+    def state(self):
+        """
+        New state buffer, starting from the initial states.
+        """
+        return State(self)
+
+    def local_state(self):
+        """
+        State buffer of the calling thread, created on first use.
+        """
+        try:
+            return self._local.state
+        except AttributeError:
+            self._local.state = state = State(self)
+            return state
+
+    def update(self, state, **inputs):
+        """
+        Update `state` with the given input values for the given named input
+        nodes, like `model.Network.update`.
+        """
+        values = state.values
+        for name, value in inputs.iteritems():
+            values[self.slots[name]] = value
+        for slot, sources, weights, threshold in self.gates:
+            value = 0
+            for index in xrange(len(sources)):
+                value += values[sources[index]] * weights[index]
+            values[slot] = 1 if value >= threshold else 0
+        return tuple(values[slot] for slot in self.outputs)
+
+    def evaluate(self, **inputs):
+        """
+        Update a fresh state buffer, leaving no state behind.
+        """
+        return self.update(State(self), **inputs)
+
+    def packed_state(self, mask):
+        """
+        Initial states repeated across every lane in `mask`.
+        """
+        return [mask if state else 0 for state in self.initial]
+
+    def evaluate_packed(self, inputs, mask, values=None):
+        """
+        Evaluate one input vector per lane.
+
+        `inputs` maps input names to integers holding one input state per bit.
+        `mask` has a bit set for every lane in use. `values`, if given, is a
+        packed state list that is updated in place, otherwise evaluation
+        starts from the initial states. Inputs that are not given keep their
+        state.
+
+        Returns the packed states of the outputs.
+        """
+        if values is None:
+            values = self.packed_state(mask)
+        for name, lanes in inputs.iteritems():
+            values[self.slots[name]] = lanes & mask
+        for slot, terms in self.covers:
+            out = 0
+            for on, off in terms:
+                term = mask
+                for source in on:
+                    term &= values[source]
+                for source in off:
+                    term &= ~values[source]
+                out |= term
+            values[slot] = out
+        return tuple(values[slot] for slot in self.outputs)
+
+    def __repr__(self):
+        return u"CompiledNetwork(%d nodes, %d gates)" % (
+            len(self.nodes), len(self.gates))
+
+
+class State(object):
+    """
+    Node states of one evaluation context of a `CompiledNetwork`.
+
+    `state.values` states by slot
+    `state["a"]` retrieves the state of an input named "a"
+    `state[0]` retrieves the state of the first output
+    `state[node]` retrieves the state of any node of the network
+    """
+
+    def __init__(self, network, values=None):
+        self.network = network
+        if values is None:
+            values = list(network.initial)
+        self.values = values
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return self.values[self.network.outputs[key]]
+        else:
+            return self.values[self.network.index(key)]
+
+    def copy(self):
+        return State(self.network, list(self.values))
+
+    def __repr__(self):
+        return u"State(%r, %r)" % (self.network, self.values)
@@ -0,0 +1,405 @@
+# McCulloch-Pitts neuron model
+#
+# Evan Leis, 2015
+
+# Distributed evaluation of large networks.
+#
+# The neurons of a compiled network are assigned levels such that evaluating
+# level after level, in slot order within a level, gives the same result as
+# `model.Network.update`. Every level is split between a number of partitions,
+# each evaluated by its own worker. After every level, workers send back the
+# states other partitions depend on, which are forwarded in bulk with the next
+# level.
+#
+# Workers may run in this process, in child processes, or on other machines
+# through `serve`. Messages are pickled: only connect to trusted nodes.
+
+import threading
+import time
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import Client
+
+from neural.mcculloch.pitts import compiled
+
+
+def levels(network):
+    """
+    Level of every slot of a `compiled.CompiledNetwork`, inputs being level 0.
+
+    A neuron comes after the sources it reads that are evaluated before it,
+    and no later than the ones evaluated after it, whose previous state it
+    reads.
+    """
+    level = [0] * len(network)
+    earliest = [0] * len(network)
+    for slot, sources, weights, threshold in network.gates:
+        current = max(1, earliest[slot])
+        for source in sources:
+            if source < slot:
+                current = max(current, level[source] + 1)
+        level[slot] = current
+        for source in sources:
+            if source > slot:
+                earliest[source] = max(earliest[source], current)
+    return level
+
+
+class Partitioning(object):
+    """
+    Assignment of every neuron of a compiled network to a partition.
+
+    `partitioning.owners` partition of every slot, None for inputs
+    `partitioning.levels` level of every slot
+    `partitioning.cut` number of neuron inputs read across partitions
+    """
+
+    def __init__(self, network, count, owners, levels):
+        self.network = network
+        self.count = count
+        self.owners = owners
+        self.levels = levels
+        self.cut = 0
+        for slot, sources, weights, threshold in network.gates:
+            for source in sources:
+                if owners[source] is not None and \
+                        owners[source] != owners[slot]:
+                    self.cut += 1
+
+    @property
+    def sizes(self):
+        sizes = [0] * self.count
+        for owner in self.owners:
+            if owner is not None:
+                sizes[owner] += 1
+        return sizes
+
+    def __repr__(self):
+        return u"Partitioning(%r, %r, sizes=%r, cut=%r)" % (
+            self.network, self.count, self.sizes, self.cut)
+
+
+def partition(network, count):
+    """
+    Split the neurons of a compiled network into `count` partitions.
+
+    Every level is divided evenly between partitions. Within a level, each
+    neuron goes to the partition owning most of its sources among those with
+    room left, keeping chains of neurons together and the cut small.
+    """
+    if count < 1:
+        raise ValueError("Partition count must be positive: %r" % count)
+    level = levels(network)
+    owners = [None] * len(network)
+    by_level = {}
+    for gate in network.gates:
+        by_level.setdefault(level[gate[0]], []).append(gate)
+    for current in sorted(by_level):
+        gates = by_level[current]
+        capacity = -(-len(gates) // count)
+        loads = [0] * count
+        for slot, sources, weights, threshold in gates:
+            scores = [0] * count
+            for source in sources:
+                if owners[source] is not None:
+                    scores[owners[source]] += 1
+            owner = min((-scores[index], loads[index], index)
+                        for index in xrange(count)
+                        if loads[index] < capacity)[2]
+            owners[slot] = owner
+            loads[owner] += 1
+    return Partitioning(network, count, owners, level)
+
+
+class Program(object):
+    """
+    What a worker needs to evaluate one partition.
+
+    `program.levels` maps levels to `(slot, sources, weights, threshold)`
+    `program.values` states of every slot the partition reads or owns
+    `program.exports` slots whose states are sent back after every level
+    """
+
+    def __init__(self, index, levels, values, exports):
+        self.index = index
+        self.levels = levels
+        self.values = values
+        self.exports = exports
+
+    def step(self, level, updates):
+        """
+        Apply the states in `updates` and evaluate the neurons at `level`.
+
+        Returns the exported states that changed.
+        """
+        values = self.values
+        values.update(updates)
+        changed = {}
+        for slot, sources, weights, threshold in self.levels.get(level, ()):
+            value = 0
+            for index in xrange(len(sources)):
+                value += values[sources[index]] * weights[index]
+            state = 1 if value >= threshold else 0
+            if state != values[slot] and slot in self.exports:
+                changed[slot] = state
+            values[slot] = state
+        return changed
+
+    def __repr__(self):
+        return u"Program(%r, %d levels, %d values, %d exports)" % (
+            self.index, len(self.levels), len(self.values),
+            len(self.exports))
+
+
+def programs(partitioning):
+    """
+    One `Program` per partition.
+    """
+    network = partitioning.network
+    owners = partitioning.owners
+    count = partitioning.count
+    exports = [set() for dummy in xrange(count)]
+    reads = [set() for dummy in xrange(count)]
+    gates = [{} for dummy in xrange(count)]
+    for slot, sources, weights, threshold in network.gates:
+        owner = owners[slot]
+        gates[owner].setdefault(partitioning.levels[slot], []).append(
+            (slot, sources, weights, threshold))
+        reads[owner].add(slot)
+        for source in sources:
+            reads[owner].add(source)
+            if owners[source] is not None and owners[source] != owner:
+                exports[owners[source]].add(source)
+    for slot in network.outputs:
+        if owners[slot] is not None:
+            exports[owners[slot]].add(slot)
+    return [Program(index, gates[index],
+                    dict((slot, network.initial[slot])
+                         for slot in reads[index]),
+                    exports[index])
+            for index in xrange(count)]
+
+
+class LocalWorker(object):
+    """
+    Evaluates a program in this process.
+
+    Workers evaluate a level between `send` and `receive`, which returns the
+    changed exports and the seconds spent evaluating.
+    """
+
+    def __init__(self, program):
+        self.program = program
+        self._result = None
+
+    def send(self, level, updates):
+        start = time.time()
+        changed = self.program.step(level, updates)
+        self._result = changed, time.time() - start
+
+    def receive(self):
+        result, self._result = self._result, None
+        return result
+
+    def close(self):
+        pass
+
+
+def _serve_connection(connection):
+    """
+    Run the programs sent over `connection` until it is closed.
+    """
+    program = None
+    try:
+        while True:
+            message = connection.recv()
+            if message[0] == "program":
+                program = message[1]
+            elif message[0] == "step":
+                start = time.time()
+                changed = program.step(message[1], message[2])
+                connection.send((changed, time.time() - start))
+            else:
+                break
+    except EOFError:
+        pass
+    finally:
+        connection.close()
+
+
+class ConnectionWorker(object):
+    """
+    Evaluates a program at the other end of a connection.
+    """
+
+    def __init__(self, program, connection):
+        self.connection = connection
+        self.connection.send(("program", program))
+
+    def send(self, level, updates):
+        self.connection.send(("step", level, updates))
+
+    def receive(self):
+        return self.connection.recv()
+
+    def close(self):
+        try:
+            self.connection.send(("close",))
+        except (EOFError, IOError):
+            pass
+        self.connection.close()
+
+
+class ProcessWorker(ConnectionWorker):
+    """
+    Evaluates a program in a child process.
+    """
+
+    def __init__(self, program):
+        connection, child = Pipe()
+        self.process = Process(target=_serve_connection, args=(child,))
+        self.process.daemon = True
+        self.process.start()
+        child.close()
+        super(ProcessWorker, self).__init__(program, connection)
+
+    def close(self):
+        super(ProcessWorker, self).close()
+        self.process.join()
+
+
+class RemoteWorker(ConnectionWorker):
+    """
+    Evaluates a program on a node running `serve`.
+    """
+
+    def __init__(self, program, address, authkey=None):
+        super(RemoteWorker, self).__init__(
+            program, Client(address, authkey=authkey))
+
+
+def serve(listener, connections=None):
+    """
+    Serve `RemoteWorker`s connecting to a
+    `multiprocessing.connection.Listener`, each in its own thread, until
+    `connections` have been accepted or forever.
+    """
+    threads = []
+    while connections is None or len(threads) < connections:
+        thread = threading.Thread(target=_serve_connection,
+                                  args=(listener.accept(),))
+        thread.daemon = True
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+
+
+class PartitionStats(object):
+    """
+    Cumulative timings and communication volume of one partition.
+
+    `stats.sent` and `stats.received` count states, not bytes.
+    """
+
+    def __init__(self, gates):
+        self.gates = gates
+        self.seconds = 0.0
+        self.messages = 0
+        self.sent = 0
+        self.received = 0
+
+    def __repr__(self):
+        return u"PartitionStats(gates=%r, seconds=%r, messages=%r, " \
+               u"sent=%r, received=%r)" % (self.gates, self.seconds,
+                                           self.messages, self.sent,
+                                           self.received)
+
+
+class DistributedNetwork(object):
+    """
+    A network evaluated by several workers.
+
+    `net.update(**inputs)` updates inputs by name and returns the result,
+    like `model.Network.update`
+    `net.partitioning` the assignment of neurons to workers
+    `net.stats` a `PartitionStats` per partition
+    `net.values` states of inputs and of neurons read across partitions
+
+    `worker` creates the worker of every partition from its `Program`, e.g.
+    `ProcessWorker` or `lambda program: RemoteWorker(program, address)`.
+    States are kept by the workers; the network itself is never modified.
+    """
+
+    def __init__(self, network, partitions=2, worker=LocalWorker):
+        if not isinstance(network, compiled.CompiledNetwork):
+            network = compiled.CompiledNetwork(network)
+        self.network = network
+        self.partitioning = partition(network, partitions)
+        self.values = list(network.initial)
+        self.depth = max(self.partitioning.levels) if len(network) else 0
+        loaded = programs(self.partitioning)
+        self.stats = [PartitionStats(sum(len(gates) for gates in
+                                         program.levels.itervalues()))
+                      for program in loaded]
+        # partitions reading every slot, other than its owner
+        self.readers = [set() for dummy in xrange(len(network))]
+        for program in loaded:
+            for slot in program.values:
+                if self.partitioning.owners[slot] != program.index:
+                    self.readers[slot].add(program.index)
+        self._levels = [set(program.levels) for program in loaded]
+        self._pending = [{} for dummy in loaded]
+        self.workers = []
+        try:
+            for program in loaded:
+                self.workers.append(worker(program))
+        except Exception:
+            self.close()
+            raise
+
+    def update(self, **inputs):
+        """
+        Update the network with the given input values for the given named
+        input nodes.
+        """
+        # states changed since a partition was last sent anything
+        pending = self._pending
+        for name, state in inputs.iteritems():
+            slot = self.network.slots[name]
+            if state != self.values[slot]:
+                self.values[slot] = state
+                for reader in self.readers[slot]:
+                    pending[reader][slot] = state
+        for level in xrange(1, self.depth + 1):
+            busy = [index for index, levels in enumerate(self._levels)
+                    if level in levels]
+            for index in busy:
+                self.workers[index].send(level, pending[index])
+                self.stats[index].messages += 1
+                self.stats[index].sent += len(pending[index])
+                pending[index] = {}
+            for index in busy:
+                changed, seconds = self.workers[index].receive()
+                stats = self.stats[index]
+                stats.seconds += seconds
+                stats.received += len(changed)
+                for slot, state in changed.iteritems():
+                    self.values[slot] = state
+                    for reader in self.readers[slot]:
+                        pending[reader][slot] = state
+        return tuple(self.values[slot] for slot in self.network.outputs)
+
+    def close(self):
+        for worker in self.workers:
+            worker.close()
+        self.workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return u"DistributedNetwork(%r, %r)" % (
+            self.network, self.partitioning.count)
@@ -0,0 +1,190 @@
+# McCulloch-Pitts neuron model
+#
+# Evan Leis, 2015
+
+# Equivalence checking for networks.
+#
+# Compares a network against another network, or against a Python reference
+# function, over every input assignment when there are few enough inputs, and
+# over seeded random samples otherwise. Networks are evaluated bit-parallel,
+# one input vector per lane, see `compiled.CompiledNetwork.evaluate_packed`.
+
+import random
+
+from neural.mcculloch.pitts import compiled, model
+
+
+class Counterexample(object):
+    """
+    An input assignment for which the network and the reference disagree.
+    """
+
+    def __init__(self, inputs, expected, actual):
+        self.inputs = inputs
+        self.expected = expected
+        self.actual = actual
+
+    def __repr__(self):
+        return u"Counterexample(%r, expected=%r, actual=%r)" % (
+            self.inputs, self.expected, self.actual)
+
+
+class Result(object):
+    """
+    Outcome of an equivalence check.
+
+    `result.exhaustive` is true when every input assignment was checked, in
+    which case an empty `result.counterexamples` is a proof of equivalence.
+    """
+
+    def __init__(self, vectors, exhaustive, counterexamples):
+        self.vectors = vectors
+        self.exhaustive = exhaustive
+        self.counterexamples = counterexamples
+
+    @property
+    def equivalent(self):
+        return not self.counterexamples
+
+    def __nonzero__(self):
+        return self.equivalent
+
+    def __repr__(self):
+        return u"Result(vectors=%r, exhaustive=%r, counterexamples=%r)" % (
+            self.vectors, self.exhaustive, self.counterexamples)
+
+
+def exhaustive_lanes(index, width):
+    """
+    Packed states of input `index` over `width` consecutive assignments,
+    lane `j` holding bit `index` of `j`.
+    """
+    period = 1 << index
+    if period >= width:
+        return 0
+    lanes = ((1 << period) - 1) << period
+    period <<= 1
+    while period < width:
+        lanes |= lanes << period
+        period <<= 1
+    return lanes
+
+
+def check(network, reference, bitwise=False, exhaustive_limit=20,
+          samples=1 << 20, batch_size=1 << 16, seed=0, max_counterexamples=10):
+    """
+    Compare `network` against `reference`.
+
+    `reference` is either another network with the same input names and as
+    many outputs, or a function called like `network.update(**inputs)` and
+    returning the tuple of expected output states. With `bitwise=True`, the
+    function is called once per batch with packed input states (one vector
+    per bit, as in `CompiledNetwork.evaluate_packed`) and must return packed
+    output states; results are masked, so `~a` can be used for NOT.
+
+    Networks with up to `exhaustive_limit` inputs are checked over every input
+    assignment, larger networks over `samples` random assignments drawn from a
+    generator seeded with `seed`. Vectors are evaluated `batch_size` at a time
+    (rounded down to a power of two when checking exhaustively) and checking
+    stops once `max_counterexamples` have been found.
+
+    Input states are assumed to be binary.
+    """
+    if batch_size < 1:
+        raise ValueError("Batch size must be positive: %r" % batch_size)
+    if samples < 1:
+        raise ValueError("Sample count must be positive: %r" % samples)
+    net = compiled.CompiledNetwork(network)
+    names = net.names
+    if not isinstance(reference, model.Network):
+        if bitwise:
+            expect = _bitwise_reference(reference)
+        else:
+            expect = _scalar_reference(reference, names)
+    else:
+        ref = compiled.CompiledNetwork(reference)
+        if set(ref.names) != set(names):
+            raise ValueError("Input names differ: %r != %r" % (
+                sorted(names), sorted(ref.names)))
+        if len(ref.outputs) != len(net.outputs):
+            raise ValueError("Output counts differ: %d != %d" % (
+                len(net.outputs), len(ref.outputs)))
+        expect = ref.evaluate_packed
+
+    counterexamples = []
+    vectors = 0
+    exhaustive = len(names) <= exhaustive_limit
+    for inputs, width in _batches(names, exhaustive, samples, batch_size,
+                                  seed):
+        mask = (1 << width) - 1
+        actual = net.evaluate_packed(inputs, mask)
+        expected = tuple(lanes & mask for lanes in expect(inputs, mask))
+        if len(expected) != len(actual):
+            raise ValueError("Output counts differ: %d != %d" % (
+                len(actual), len(expected)))
+        diff = 0
+        for left, right in zip(actual, expected):
+            diff |= left ^ right
+        while diff and len(counterexamples) < max_counterexamples:
+            lane = (diff & -diff).bit_length() - 1
+            diff &= diff - 1
+            counterexamples.append(Counterexample(
+                dict((name, _lane(inputs[name], lane)) for name in names),
+                tuple(_lane(lanes, lane) for lanes in expected),
+                tuple(_lane(lanes, lane) for lanes in actual)))
+        vectors += width
+        if len(counterexamples) >= max_counterexamples:
+            break
+    return Result(vectors, exhaustive, counterexamples)
+
+
+def _lane(lanes, lane):
+    return (lanes >> lane) & 1
+
+
+def _batches(names, exhaustive, samples, batch_size, seed):
+    """
+    Generate `(inputs, width)` pairs of packed input states.
+    """
+    if exhaustive:
+        total = 1 << len(names)
+        # batches must hold a power of two assignments for the lane patterns
+        # of the low inputs to line up from one batch to the next
+        width = 1 << (min(total, batch_size).bit_length() - 1)
+        low = dict((name, exhaustive_lanes(index, width))
+                   for index, name in enumerate(names))
+        mask = (1 << width) - 1
+        for start in xrange(0, total, width):
+            inputs = {}
+            for index, name in enumerate(names):
+                if (1 << index) < width:
+                    inputs[name] = low[name]
+                else:
+                    inputs[name] = mask if (start >> index) & 1 else 0
+            yield inputs, width
+    else:
+        rng = random.Random(seed)
+        for start in xrange(0, samples, batch_size):
+            width = min(batch_size, samples - start)
+            yield dict((name, rng.getrandbits(width)) for name in names), width
+
+
+def _bitwise_reference(function):
+    def expect(inputs, mask):
+        return tuple(function(**inputs))
+    return expect
+
+
+def _scalar_reference(function, names):
+    def expect(inputs, mask):
+        expected = None
+        for lane in xrange(mask.bit_length()):
+            states = function(**dict(
+                (name, _lane(inputs[name], lane)) for name in names))
+            if expected is None:
+                expected = [0] * len(states)
+            for index, state in enumerate(states):
+                if state:
+                    expected[index] |= 1 << lane
+        return expected
+    return expect
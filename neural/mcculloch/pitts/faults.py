@@ -0,0 +1,235 @@
+# McCulloch-Pitts neuron model
+#
+# Evan Leis, 2015
+
+# Fault simulation.
+#
+# Faults are injected into a compiled copy of a network, never into the
+# network itself. All faulty variants of the network are evaluated at once,
+# one per bit ("lane") of Python integers as in
+# `compiled.CompiledNetwork.evaluate_packed`, with lane 0 holding the fault
+# free network. A fault is detected by an input vector when any output of its
+# lane differs from lane 0.
+
+from neural.mcculloch.pitts import compiled, model
+
+
+class StuckAt(object):
+    """
+    Node whose state is stuck at `value`, whatever its inputs.
+    """
+
+    def __init__(self, node, value):
+        self.node = node
+        self.value = value
+
+    def __repr__(self):
+        return u"StuckAt(%r, %r)" % (self.node, self.value)
+
+
+class WeightFault(object):
+    """
+    Neuron whose weight at `index` is `weight` instead.
+    """
+
+    def __init__(self, neuron, index, weight):
+        self.neuron = neuron
+        self.index = index
+        self.weight = weight
+
+    def __repr__(self):
+        return u"WeightFault(%r, %r, %r)" % (
+            self.neuron, self.index, self.weight)
+
+
+def stuck_at_faults(network, inputs=False):
+    """
+    Stuck-at-0 and stuck-at-1 faults of every neuron of `network`, and of
+    every input too if `inputs` is true.
+    """
+    faults = []
+    for node in network:
+        if isinstance(node, model.Neuron) or inputs:
+            faults.append(StuckAt(node, 0))
+            faults.append(StuckAt(node, 1))
+    return faults
+
+
+def weight_faults(network, delta=1):
+    """
+    Faults moving every weight of every neuron of `network` by `delta` in
+    either direction.
+    """
+    faults = []
+    for node in network:
+        if isinstance(node, model.Neuron):
+            for index, weight in enumerate(node.weights):
+                faults.append(WeightFault(node, index, weight - delta))
+                faults.append(WeightFault(node, index, weight + delta))
+    return faults
+
+
+class Report(object):
+    """
+    Outcome of a fault simulation.
+
+    `report.vectors` number of vectors applied
+    `report.matrix[i]` has bit `j` set when vector `j` detects fault `i`.
+    When faults are dropped once detected, only the first vector detecting a
+    fault is set.
+    """
+
+    def __init__(self, faults, vectors, matrix):
+        self.faults = faults
+        self.vectors = vectors
+        self.matrix = matrix
+
+    def detects(self, fault, vector):
+        return bool((self.matrix[fault] >> vector) & 1)
+
+    @property
+    def detected(self):
+        return [fault for fault, row in zip(self.faults, self.matrix) if row]
+
+    @property
+    def undetected(self):
+        return [fault for fault, row in zip(self.faults, self.matrix)
+                if not row]
+
+    @property
+    def coverage(self):
+        if not self.faults:
+            return 1.0
+        return float(len(self.detected)) / len(self.faults)
+
+    def __repr__(self):
+        return u"Report(%d faults, %d vectors, coverage=%r)" % (
+            len(self.faults), self.vectors, self.coverage)
+
+
+def exhaustive_vectors(names):
+    """
+    Every assignment of the inputs in `names`, vector `j` setting input `i`
+    to bit `i` of `j`.
+    """
+    return [dict((name, (vector >> index) & 1)
+                 for index, name in enumerate(names))
+            for vector in xrange(1 << len(names))]
+
+
+def simulate(network, faults, vectors=None, drop=True, exhaustive_limit=16):
+    """
+    Apply every input vector in `vectors` to every faulty variant of
+    `network`, each vector starting from the states of the network.
+
+    `vectors` is an iterable of dicts mapping input names to states, by
+    default every assignment of networks with up to `exhaustive_limit`
+    inputs. With `drop`, a fault is no longer simulated once a vector detects
+    it, and simulation stops once every fault has been detected.
+
+    Returns a `Report`.
+    """
+    net = compiled.CompiledNetwork(network)
+    if vectors is None:
+        if len(net.names) > exhaustive_limit:
+            raise ValueError("Too many inputs to enumerate: %d" % (
+                len(net.names),))
+        vectors = exhaustive_vectors(net.names)
+    gates = dict((gate[0], gate) for gate in net.gates)
+    stuck = []
+    changes = []
+    for index, fault in enumerate(faults):
+        if isinstance(fault, StuckAt):
+            stuck.append((index, net.index(fault.node), fault.value))
+        elif isinstance(fault, WeightFault):
+            slot, sources, weights, threshold = gates[
+                net.index(fault.neuron)]
+            weights = list(weights)
+            weights[fault.index] = fault.weight
+            terms = tuple((tuple(sources[i] for i in on),
+                           tuple(sources[i] for i in off))
+                          for on, off in compiled.cover(weights, threshold))
+            changes.append((index, slot, terms))
+        else:
+            raise TypeError("Unknown fault: %r" % (fault,))
+
+    matrix = [0] * len(faults)
+    active = set(xrange(len(faults)))
+    lanes = None
+    count = 0
+    for vector, inputs in enumerate(vectors):
+        if not active:
+            break
+        count += 1
+        if lanes is None:
+            lanes, mask, forced, variants = _lanes(active, stuck, changes)
+        values = [mask if state else 0 for state in net.initial]
+        for name, state in inputs.iteritems():
+            values[net.slots[name]] = mask if state else 0
+        for slot, force in forced.iteritems():
+            if slot not in gates:
+                values[slot] = _force(values[slot], force)
+        for slot, terms in net.covers:
+            out = _cover(values, terms, mask)
+            for changed, lane in variants.get(slot, ()):
+                out = (out & ~lane) | (_cover(values, changed, mask) & lane)
+            values[slot] = _force(out, forced.get(slot))
+        diff = 0
+        for slot in net.outputs:
+            out = values[slot]
+            diff |= out ^ (mask if out & 1 else 0)
+        detected = lanes
+        while diff:
+            lane = (diff & -diff).bit_length() - 1
+            diff &= diff - 1
+            matrix[detected[lane]] |= 1 << vector
+            if drop:
+                active.discard(detected[lane])
+                lanes = None
+    return Report(list(faults), count, matrix)
+
+
+def _lanes(active, stuck, changes):
+    """
+    Assign a lane to every active fault, lane 0 being the good network.
+
+    Returns the fault index of every lane, the lane mask, the lanes forced to
+    0 and 1 by slot, and the lanes of every changed cover by slot.
+    """
+    lanes = [None]
+    forced = {}
+    for index, slot, value in stuck:
+        if index in active:
+            lane = 1 << len(lanes)
+            lanes.append(index)
+            zeros, ones = forced.get(slot, (0, 0))
+            if value:
+                forced[slot] = zeros, ones | lane
+            else:
+                forced[slot] = zeros | lane, ones
+    variants = {}
+    for index, slot, terms in changes:
+        if index in active:
+            lane = 1 << len(lanes)
+            lanes.append(index)
+            variants.setdefault(slot, []).append((terms, lane))
+    return lanes, (1 << len(lanes)) - 1, forced, variants
+
+
+def _force(lanes, forced):
+    if forced is None:
+        return lanes
+    zeros, ones = forced
+    return (lanes & ~zeros) | ones
+
+
+def _cover(values, terms, mask):
+    out = 0
+    for on, off in terms:
+        term = mask
+        for source in on:
+            term &= values[source]
+        for source in off:
+            term &= ~values[source]
+        out |= term
+    return out
@@ -0,0 +1,180 @@
+# McCulloch-Pitts neuron model
+#
+# Evan Leis, 2015
+
+# State trajectories of a network.
+#
+# Every recorded step stores the state of every node, in evaluation order, one
+# bit per node. Steps go into a fixed-capacity ring buffer that is either kept
+# in memory or mapped onto a file, so long runs only keep their most recent
+# `capacity` steps and never grow.
+
+import binascii
+import mmap
+import string
+
+from neural.mcculloch.pitts import compiled
+
+_BITS = string.maketrans("\x00\x01", "01")
+
+
+class Recorder(object):
+    """
+    Ring buffer of bit-packed state vectors of a network.
+
+    `recorder.update(**inputs)` updates the network and records its states
+    `recorder.record()` records the current states of the network
+    `recorder.record(values)` records the given states, by slot
+    `recorder.history(node)` states of a node, oldest first
+    `recorder.window(start, stop)` state vectors of a range of steps
+
+    Steps are numbered from 0 in the order they were recorded; `recorder.time`
+    is the number of steps recorded so far and `recorder.first` the oldest one
+    still held. With a `path`, the buffer is a memory-mapped file of
+    `capacity` rows instead of memory of the process.
+
+    A `compiled.CompiledNetwork` keeps its states in `recorder.state`, a
+    `compiled.State` created for the recorder unless `state` is given;
+    `update` evaluates into it and `record` reads from it.
+
+    States must be 0 or 1.
+    """
+
+    def __init__(self, network, capacity, path=None, state=None):
+        if capacity < 1:
+            raise ValueError("Capacity must be positive: %r" % capacity)
+        self.network = network
+        if isinstance(network, compiled.CompiledNetwork):
+            self.nodes = network.nodes
+            if state is None:
+                state = network.state()
+        else:
+            if state is not None:
+                raise ValueError("Only compiled networks have a state")
+            self.nodes = tuple(network)
+        self.state = state
+        self._positions = dict(
+            (id(node), slot) for slot, node in enumerate(self.nodes))
+        self.capacity = capacity
+        self.width = len(self.nodes)
+        self.row = max(1, (self.width + 7) // 8)
+        self._padding = "0" * (self.row * 8 - self.width)
+        self.time = 0
+        self.path = path
+        size = self.capacity * self.row
+        if path is None:
+            self._file = None
+            self.buffer = bytearray(size)
+        else:
+            self._file = open(path, "w+b")
+            self._file.truncate(size)
+            self.buffer = mmap.mmap(self._file.fileno(), size)
+
+    def __len__(self):
+        return min(self.time, self.capacity)
+
+    @property
+    def first(self):
+        return self.time - len(self)
+
+    def update(self, **inputs):
+        """
+        Update the network and record the resulting states.
+        """
+        if self.state is None:
+            states = self.network.update(**inputs)
+        else:
+            states = self.network.update(self.state, **inputs)
+        self.record()
+        return states
+
+    def record(self, values=None):
+        """
+        Record a state vector, by default the current states of the network.
+
+        Returns the step number.
+        """
+        if values is None:
+            if self.state is None:
+                values = [node.state for node in self.nodes]
+            else:
+                values = self.state.values
+        if len(values) != self.width:
+            raise ValueError("Expected %d states, got %d" % (
+                self.width, len(values)))
+        bits = str(bytearray(values)).translate(_BITS) + self._padding
+        offset = (self.time % self.capacity) * self.row
+        self.buffer[offset:offset + self.row] = binascii.unhexlify(
+            "%0*x" % (self.row * 2, int(bits, 2)))
+        self.time += 1
+        return self.time - 1
+
+    def slot(self, node):
+        """
+        Position of a node, or of an input by name, in recorded vectors.
+        """
+        if isinstance(node, int):
+            return node
+        if isinstance(node, basestring):
+            for slot, item in enumerate(self.nodes):
+                if getattr(item, "name", None) == node:
+                    return slot
+        elif id(node) in self._positions:
+            return self._positions[id(node)]
+        raise KeyError(node)
+
+    def _steps(self, start, stop):
+        start = self.first if start is None else max(start, self.first)
+        stop = self.time if stop is None else min(stop, self.time)
+        return xrange(start, stop)
+
+    def _offset(self, step):
+        return (step % self.capacity) * self.row
+
+    def history(self, node, start=None, stop=None):
+        """
+        States of a node for the steps in `[start, stop)` still held.
+        """
+        slot = self.slot(node)
+        byte = slot // 8
+        shift = 7 - slot % 8
+        buffer = self.buffer
+        # mmap items are characters, bytearray items integers
+        read = int if self._file is None else ord
+        return [(read(buffer[self._offset(step) + byte]) >> shift) & 1
+                for step in self._steps(start, stop)]
+
+    def window(self, start=None, stop=None):
+        """
+        State vectors for the steps in `[start, stop)` still held.
+        """
+        vectors = []
+        padding = len(self._padding)
+        for step in self._steps(start, stop):
+            offset = self._offset(step)
+            bits = int(binascii.hexlify(
+                self.buffer[offset:offset + self.row]), 16) >> padding
+            vectors.append(tuple(
+                (bits >> shift) & 1
+                for shift in xrange(self.width - 1, -1, -1)))
+        return vectors
+
+    def flush(self):
+        if self._file is not None:
+            self.buffer.flush()
+
+    def close(self):
+        if self._file is not None:
+            self.buffer.close()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return u"Recorder(%r, %r, path=%r)" % (
+            self.network, self.capacity, self.path)
@@ -0,0 +1,195 @@
+# McCulloch-Pitts neuron model
+#
+# Evan Leis, 2015
+
+# Subcircuit templates.
+#
+# A template is a subcircuit compiled once, e.g. from `network.FullAdder`, and
+# instantiated any number of times in a `Circuit`. Instances keep no gates of
+# their own: an instance is a lane of a group of instances of the same
+# template at the same depth, whose states are packed one lane per bit and
+# evaluated together with `compiled.CompiledNetwork.evaluate_packed`.
+
+from neural.mcculloch.pitts import compiled, model
+
+
+class Template(object):
+    """
+    Subcircuit built once by calling `build` with one named input per port,
+    like the `build_net` methods of the prebuilt networks.
+
+    `Template(network.FullAdder.build_net, "cin", "a", "b")`
+    """
+
+    def __init__(self, build, *ports):
+        self.ports = ports
+        self.network = compiled.CompiledNetwork(
+            model.Network(*build(*[model.Input(port) for port in ports])))
+        # ports the subcircuit never reads are not bound during evaluation
+        self.used = tuple((index, port) for index, port in enumerate(ports)
+                          if port in self.network.slots)
+
+    def __repr__(self):
+        return u"Template(%r, %r)" % (self.network, self.ports)
+
+
+class Port(object):
+    """
+    Source of a value in a circuit: an output of an instance, or a circuit
+    input by name when `instance` is None.
+    """
+
+    __slots__ = ("instance", "index")
+
+    def __init__(self, instance, index):
+        self.instance = instance
+        self.index = index
+
+    def __repr__(self):
+        return u"Port(%r, %r)" % (self.instance, self.index)
+
+
+class Instance(object):
+    """
+    One instance of a template, lane `lane` of its group.
+
+    `instance[0]` retrieves the port of the first output
+    """
+
+    __slots__ = ("group", "lane")
+
+    def __init__(self, group, lane):
+        self.group = group
+        self.lane = lane
+
+    @property
+    def template(self):
+        return self.group.template
+
+    def __getitem__(self, index):
+        if not 0 <= index < len(self.group.template.network.outputs):
+            raise IndexError(index)
+        return Port(self, index)
+
+    def states(self):
+        """
+        States of every node of the subcircuit, in evaluation order.
+        """
+        return tuple((values >> self.lane) & 1 for values in self.group.values)
+
+    def __repr__(self):
+        return u"Instance(%r, level=%r, lane=%r)" % (
+            self.group.template, self.group.level, self.lane)
+
+
+class Group(object):
+    """
+    Instances of one template at one level, evaluated together.
+    """
+
+    def __init__(self, template, level):
+        self.template = template
+        self.level = level
+        self.bindings = []
+        self.values = [0] * len(template.network)
+
+    def add(self, ports):
+        lane = len(self.bindings)
+        self.bindings.append(ports)
+        for slot, state in enumerate(self.template.network.initial):
+            if state:
+                self.values[slot] |= 1 << lane
+        return Instance(self, lane)
+
+
+class Circuit(object):
+    """
+    Circuit of template instances.
+
+    `circuit.input("a")` retrieves the port of a circuit input named "a"
+    `circuit.instantiate(template, *ports)` adds an instance of `template`
+    `circuit.outputs` ports returned by `update`, in order
+    `circuit.update(**inputs)` updates inputs by name and returns the result
+
+    Ports are bound when an instance is created and may only come from
+    circuit inputs or earlier instances, so circuits are never cyclical.
+    Instances at the same depth are evaluated in the same pass as every other
+    instance of their template at that depth.
+    """
+
+    def __init__(self):
+        self.inputs = {}
+        self.states = {}
+        self.outputs = []
+        self.levels = []
+        self._groups = {}
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def input(self, name):
+        if name not in self.inputs:
+            self.inputs[name] = Port(None, name)
+            self.states[name] = 0
+        return self.inputs[name]
+
+    def instantiate(self, template, *ports):
+        """
+        Add an instance of `template` with its ports bound to `ports`, in
+        order. Names stand for the circuit inputs they name.
+        """
+        if len(ports) != len(template.ports):
+            raise ValueError("Expected %d ports, got %d" % (
+                len(template.ports), len(ports)))
+        ports = tuple(self.input(port) if isinstance(port, basestring)
+                      else port for port in ports)
+        level = 0
+        for port in ports:
+            if port.instance is not None:
+                level = max(level, port.instance.group.level + 1)
+        key = (id(template), level)
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = Group(template, level)
+            while len(self.levels) <= level:
+                self.levels.append([])
+            self.levels[level].append(group)
+        self.size += 1
+        return group.add(ports)
+
+    def state(self, port):
+        """
+        Current state of a port.
+        """
+        if port.instance is None:
+            return self.states[port.index]
+        group = port.instance.group
+        slot = group.template.network.outputs[port.index]
+        return (group.values[slot] >> port.instance.lane) & 1
+
+    def update(self, **inputs):
+        """
+        Update the circuit with the given input values for the given named
+        inputs.
+        """
+        for name, state in inputs.iteritems():
+            if name not in self.inputs:
+                raise KeyError(name)
+            self.states[name] = state
+        state = self.state
+        for groups in self.levels:
+            for group in groups:
+                template = group.template
+                packed = {}
+                for index, name in template.used:
+                    # lane 0 is the last character
+                    packed[name] = int("".join(
+                        "1" if state(ports[index]) else "0"
+                        for ports in reversed(group.bindings)), 2)
+                template.network.evaluate_packed(
+                    packed, (1 << len(group.bindings)) - 1, group.values)
+        return tuple(state(port) for port in self.outputs)
+
+    def __repr__(self):
+        return u"Circuit(%d instances)" % (self.size,)
@@ -0,0 +1,362 @@
+# -*- coding: utf-8 -*-
+#
+# McCulloch-Pitts neuron model
+#
+# Evan Leis, 2015
+#
+# References:
+#
+# [1] "The Handbook of Brain Theory and Neural Networks"
+# Editor Michael A. Arbib
+# Cambridge, Massachusetts; London, England: MIT, 2003
+
+# Training perceptrons over streams of samples.
+#
+# A sample is a pair `(inputs, expected_state)`, `inputs` holding one state
+# per perceptron input, in order. Samples are consumed one chunk at a time, so
+# a source may be far larger than memory.
+#
+# `MultiTrainer` trains many perceptrons side by side over one dataset,
+# optionally spread over several processes.
+
+import copy
+import json
+import multiprocessing
+import os
+import random
+
+
+def read_samples(path):
+    """
+    Samples from a text file, one per line: the input states followed by the
+    expected state, separated by whitespace. Blank lines and lines starting
+    with "#" are skipped.
+    """
+    with open(path) as source:
+        for line in source:
+            fields = line.split()
+            if not fields or fields[0].startswith("#"):
+                continue
+            values = [float(field) if "." in field else int(field)
+                      for field in fields]
+            yield tuple(values[:-1]), values[-1]
+
+
+def chunks(samples, size):
+    """
+    Lists of up to `size` consecutive samples.
+    """
+    chunk = []
+    for sample in samples:
+        chunk.append(sample)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def shuffled(samples, buffer_size, rng=random):
+    """
+    Shuffle a stream through a buffer of `buffer_size` samples.
+
+    Each sample read replaces a randomly chosen one from the buffer, which is
+    produced in its place. Samples are only moved around within a window of
+    about `buffer_size`, but memory stays bounded.
+    """
+    buffer = []
+    for sample in samples:
+        if len(buffer) < buffer_size:
+            buffer.append(sample)
+            continue
+        index = rng.randrange(buffer_size)
+        yield buffer[index]
+        buffer[index] = sample
+    rng.shuffle(buffer)
+    for sample in buffer:
+        yield sample
+
+
+class ChunkStats(object):
+    """
+    Convergence metrics of one chunk.
+
+    `stats.errors` samples the perceptron got wrong before training on them
+    `stats.change` sum of the absolute weight changes over the chunk
+    """
+
+    def __init__(self, epoch, chunk, samples, errors, change):
+        self.epoch = epoch
+        self.chunk = chunk
+        self.samples = samples
+        self.errors = errors
+        self.change = change
+
+    @property
+    def error_rate(self):
+        return float(self.errors) / self.samples if self.samples else 0.0
+
+    def __repr__(self):
+        return u"ChunkStats(epoch=%r, chunk=%r, samples=%r, errors=%r, " \
+               u"change=%r)" % (self.epoch, self.chunk, self.samples,
+                                self.errors, self.change)
+
+
+class StreamTrainer(object):
+    """
+    Trains a `perceptron.Perceptron` over a stream of samples.
+
+    Samples go through `shuffled` when `shuffle_buffer` is set, using a
+    generator seeded with `seed` plus the epoch, and are then trained on in
+    chunks of `chunk_size` with the same rule as `Perceptron.train`.
+
+    With a `checkpoint` path, the weights and the position in the stream are
+    written there every `checkpoint_every` chunks and after every epoch, and
+    `train` picks up from the last checkpoint written.
+    """
+
+    def __init__(self, perceptron, learning_rate, chunk_size=1024,
+                 shuffle_buffer=0, seed=0, checkpoint=None,
+                 checkpoint_every=16):
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be positive: %r" % chunk_size)
+        if checkpoint_every < 1:
+            raise ValueError("Checkpoint interval must be positive: %r" %
+                             checkpoint_every)
+        self.perceptron = perceptron
+        self.learning_rate = learning_rate
+        self.chunk_size = chunk_size
+        self.shuffle_buffer = shuffle_buffer
+        self.seed = seed
+        self.checkpoint = checkpoint
+        self.checkpoint_every = checkpoint_every
+
+    def train(self, source, epochs=1, report=None):
+        """
+        Train for `epochs` passes over `source`, calling `report` with the
+        `ChunkStats` of every chunk.
+
+        `source` is a file path for `read_samples`, a function returning a
+        new iterable of samples for every pass, or an iterable of samples when
+        training for a single epoch.
+
+        Returns the number of samples trained on and the number of errors.
+        Both are 0 when the checkpoint already records `epochs` passes: the
+        weights are loaded from it and the source is never read. Remove the
+        checkpoint, or ask for more epochs, to train further.
+        """
+        epoch, position = self._resume()
+        samples = errors = 0
+        while epoch < epochs:
+            stream = self._stream(source, epoch, epochs)
+            for dummy in xrange(position):
+                try:
+                    next(stream)
+                except StopIteration:
+                    raise ValueError(
+                        "Checkpoint %r is %d samples into epoch %d, the "
+                        "source is shorter" % (self.checkpoint, position,
+                                               epoch))
+            for chunk in chunks(stream, self.chunk_size):
+                stats = self._train_chunk(chunk)
+                stats.epoch = epoch
+                stats.chunk = position // self.chunk_size
+                position += stats.samples
+                samples += stats.samples
+                errors += stats.errors
+                if report is not None:
+                    report(stats)
+                if (stats.chunk + 1) % self.checkpoint_every == 0:
+                    self._save(epoch, position)
+            epoch += 1
+            position = 0
+            self._save(epoch, position)
+        return samples, errors
+
+    def _stream(self, source, epoch, epochs):
+        if isinstance(source, basestring):
+            stream = read_samples(source)
+        elif callable(source):
+            stream = source()
+        elif epochs > 1:
+            raise ValueError("Training for several epochs needs a path or a "
+                             "function returning the samples")
+        else:
+            stream = source
+        if self.shuffle_buffer:
+            rng = random.Random(self.seed + epoch)
+            stream = shuffled(stream, self.shuffle_buffer, rng)
+        return iter(stream)
+
+    def _train_chunk(self, chunk):
+        """
+        [1] pp. 20
+
+        Δw[ij] = k(Y[i] - y[i])x[j]
+        """
+        weights = self.perceptron.weights
+        threshold = self.perceptron.threshold
+        learning_rate = self.learning_rate
+        count = len(weights)
+        errors = 0
+        change = 0
+        for inputs, expected_state in chunk:
+            value = 0
+            for index in xrange(count):
+                value += inputs[index] * weights[index]
+            difference = expected_state - (1 if value >= threshold else 0)
+            if difference == 0:
+                continue
+            errors += 1
+            for index in xrange(count):
+                delta = learning_rate * difference * inputs[index]
+                weights[index] += delta
+                change += abs(delta)
+        return ChunkStats(None, None, len(chunk), errors, change)
+
+    def _resume(self):
+        if self.checkpoint is None or not os.path.exists(self.checkpoint):
+            return 0, 0
+        with open(self.checkpoint) as checkpoint:
+            saved = json.load(checkpoint)
+        self.perceptron.weights[:] = saved["weights"]
+        return saved["epoch"], saved["position"]
+
+    def _save(self, epoch, position):
+        if self.checkpoint is None:
+            return
+        # write next to the checkpoint first, a crash never leaves half a file
+        partial = self.checkpoint + ".partial"
+        with open(partial, "w") as checkpoint:
+            json.dump(dict(weights=self.perceptron.weights, epoch=epoch,
+                           position=position), checkpoint)
+        os.rename(partial, self.checkpoint)
+
+
+class MultiTrainer(object):
+    """
+    Trains many perceptrons at once on a shared dataset.
+
+    The dataset has one column per input name in `columns`, by default the
+    input names of the first perceptron; every perceptron is trained on the
+    columns named like its inputs, so each may use a different subset.
+    `learning_rates` is either one rate for every perceptron or a sequence
+    of rates, one per perceptron.
+
+    `trainer.weights` holds the weights of every perceptron, one row each.
+
+    Each sample is decoded once for all perceptrons, perceptrons sharing the
+    same inputs are updated together, and inputs that are off are skipped.
+    The weights end up exactly as if every perceptron had been trained alone
+    with `Perceptron.train`.
+    """
+
+    def __init__(self, perceptrons, learning_rates, columns=None):
+        self.perceptrons = list(perceptrons)
+        if isinstance(learning_rates, (int, long, float)):
+            learning_rates = [learning_rates] * len(self.perceptrons)
+        self.learning_rates = list(learning_rates)
+        if len(self.learning_rates) != len(self.perceptrons):
+            raise ValueError("Expected %d learning rates, got %d" % (
+                len(self.perceptrons), len(self.learning_rates)))
+        if columns is None:
+            columns = [input.name for input in self.perceptrons[0].inputs]
+        self.columns = tuple(columns)
+        positions = dict((name, index) for index, name in
+                         enumerate(self.columns))
+        self.indexes = []
+        for p in self.perceptrons:
+            try:
+                self.indexes.append(
+                    tuple(positions[input.name] for input in p.inputs))
+            except KeyError as ex:
+                raise ValueError("No column for input: %r" % ex.args[0])
+        self.weights = [p.weights for p in self.perceptrons]
+
+    @classmethod
+    def grid(cls, perceptron, learning_rates):
+        """
+        One copy of `perceptron` per learning rate, sharing its inputs.
+        """
+        learning_rates = list(learning_rates)
+        perceptrons = []
+        for dummy in learning_rates:
+            p = copy.copy(perceptron)
+            p.weights = list(perceptron.weights)
+            perceptrons.append(p)
+        return cls(perceptrons, learning_rates)
+
+    def train(self, samples, epochs=1, processes=None):
+        """
+        Train every perceptron for `epochs` passes over `samples`.
+
+        `samples` may be an iterator when training for a single epoch.
+        With `processes`, perceptrons are divided between that many worker
+        processes, each one receiving its own copy of `samples`.
+
+        Returns the number of errors of each perceptron over all passes.
+        """
+        if iter(samples) is samples:
+            if epochs > 1:
+                raise ValueError("Training for several epochs needs a "
+                                 "sequence of samples, not an iterator")
+            if processes is not None and processes > 1:
+                samples = list(samples)
+        models = [(indexes, list(p.weights), p.threshold, rate)
+                  for indexes, p, rate in zip(self.indexes, self.perceptrons,
+                                              self.learning_rates)]
+        if processes is None or processes < 2 or len(models) < 2:
+            results = _train_models((models, samples, epochs))
+        else:
+            jobs = [(models[start::processes], samples, epochs)
+                    for start in xrange(min(processes, len(models)))]
+            pool = multiprocessing.Pool(len(jobs))
+            try:
+                parts = pool.map(_train_models, jobs)
+            finally:
+                pool.close()
+                pool.join()
+            results = [None] * len(models)
+            for start, part in enumerate(parts):
+                results[start::len(jobs)] = part
+        errors = []
+        for p, (weights, model_errors) in zip(self.perceptrons, results):
+            p.weights[:] = weights
+            errors.append(model_errors)
+        return errors
+
+
+def _train_models(job):
+    """
+    Train `(indexes, weights, threshold, learning_rate)` models together,
+    returning `(weights, errors)` for each.
+
+    [1] pp. 20
+
+    Δw[ij] = k(Y[i] - y[i])x[j]
+    """
+    models, samples, epochs = job
+    groups = {}
+    for model in models:
+        groups.setdefault(model[0], []).append(model)
+    groups = groups.items()
+    errors = dict((id(model), 0) for model in models)
+    for dummy in xrange(epochs):
+        for inputs, expected_state in samples:
+            for indexes, group in groups:
+                active = [(position, inputs[column])
+                          for position, column in enumerate(indexes)
+                          if inputs[column]]
+                for model in group:
+                    weights = model[1]
+                    value = 0
+                    for position, state in active:
+                        value += state * weights[position]
+                    difference = expected_state - (
+                        1 if value >= model[2] else 0)
+                    if difference == 0:
+                        continue
+                    errors[id(model)] += 1
+                    for position, state in active:
+                        weights[position] += model[3] * difference * state
+    return [(model[1], errors[id(model)]) for model in models]
@@ -0,0 +1,169 @@
+# McCulloch-Pitts neuron model
+#
+# Evan Leis, 2015
+
+# Make sure things behave like expected
+
+import random
+import threading
+import unittest
+
+from neural.mcculloch.pitts import compiled, model, network, perceptron
+
+
+class CoverTestCase(unittest.TestCase):
+    def test_and_cover(self):
+        self.assertEqual(compiled.cover((1, 1), 2), [((0, 1), ())])
+
+    def test_or_cover(self):
+        self.assertEqual(compiled.cover((1, 1), 1), [((0,), ()), ((1,), (0,))])
+
+    def test_not_cover(self):
+        self.assertEqual(compiled.cover((-1,), 0), [((), (0,))])
+
+    def test_never_fires(self):
+        self.assertEqual(compiled.cover((0, 0, 0, 0), 1), [])
+
+
+class CompiledNetworkTestCase(unittest.TestCase):
+    def test_slots_follow_evaluation_order(self):
+        a = model.Input("a")
+        b = model.Input("b")
+        gate = model.AndNeuron(a, b)
+        net = compiled.CompiledNetwork(model.Network(gate))
+        self.assertEqual(net.names, ("a", "b"))
+        self.assertEqual(net.index("a"), 0)
+        self.assertEqual(net.index(b), 1)
+        self.assertEqual(net.index(gate), 2)
+        self.assertEqual(net.outputs, (2,))
+        self.assertEqual(len(net), 3)
+
+    def test_evaluate_packed_matches_update(self):
+        cin = model.Input("cin")
+        a = model.Input("a")
+        b = model.Input("b")
+        adder = network.FullAdder(cin, a, b)
+        net = compiled.CompiledNetwork(adder)
+        # lane j holds the assignment cin, a, b = bits 0, 1, 2 of j
+        output, carry = net.evaluate_packed(
+            dict(cin=0xaa, a=0xcc, b=0xf0), 0xff)
+        for lane in xrange(8):
+            expected = adder.update(cin=lane & 1, a=(lane >> 1) & 1,
+                                    b=(lane >> 2) & 1)
+            self.assertEqual(((output >> lane) & 1, (carry >> lane) & 1),
+                             expected)
+
+    def test_covers_are_built_on_first_use(self):
+        a = model.Input("a")
+        b = model.Input("b")
+        gate = model.AndNeuron(a, b)
+        net = compiled.CompiledNetwork(model.Network(gate))
+        self.assertEqual(net.gates, ((2, (0, 1), (1, 1), 2),))
+        self.assertIsNone(net._covers)
+        self.assertEqual(net.evaluate_packed(dict(a=0b1100, b=0b1010), 0xf),
+                         (0b1000,))
+        self.assertEqual(net.covers, ((2, (((0, 1), ()),)),))
+
+    def test_evaluate_packed_leaves_network_alone(self):
+        a = model.Input("a")
+        b = model.Input("b")
+        gate = model.OrNeuron(a, b)
+        net = compiled.CompiledNetwork(model.Network(gate))
+        net.evaluate_packed(dict(a=1, b=1), 1)
+        self.assertEqual(a.state, 0)
+        self.assertEqual(gate.state, 0)
+
+    def test_evaluate_packed_cyclical_network(self):
+        a = model.NotNeuron(None, state=0)
+        a.inputs = [a]
+        net = compiled.CompiledNetwork(model.Network(a))
+        values = net.packed_state(0xf)
+        self.assertEqual(net.evaluate_packed({}, 0xf, values), (0xf,))
+        self.assertEqual(net.evaluate_packed({}, 0xf, values), (0,))
+
+
+class StateTestCase(unittest.TestCase):
+    def test_update_matches_network(self):
+        cin = model.Input("cin")
+        a = model.Input("a")
+        b = model.Input("b")
+        adder = network.FullAdder(cin, a, b)
+        net = compiled.CompiledNetwork(adder)
+        state = net.state()
+        for lane in xrange(8):
+            inputs = dict(cin=lane & 1, a=(lane >> 1) & 1, b=(lane >> 2) & 1)
+            self.assertEqual(net.update(state, **inputs),
+                             adder.update(**inputs))
+            self.assertEqual(state[0], adder.output.state)
+            self.assertEqual(state[adder.carry], adder.carry.state)
+            self.assertEqual(state["a"], a.state)
+
+    def test_update_leaves_network_alone(self):
+        a = model.Input("a")
+        b = model.Input("b")
+        gate = model.AndNeuron(a, b)
+        net = compiled.CompiledNetwork(model.Network(gate))
+        self.assertEqual(net.evaluate(a=1, b=1), (1,))
+        self.assertEqual(a.state, 0)
+        self.assertEqual(gate.state, 0)
+
+    def test_states_are_independent(self):
+        a = model.NotNeuron(None, state=0)
+        a.inputs = [a]
+        net = compiled.CompiledNetwork(model.Network(a))
+        first = net.state()
+        second = net.state()
+        self.assertEqual(net.update(first), (1,))
+        self.assertEqual(net.update(first), (0,))
+        self.assertEqual(net.update(second), (1,))
+        copy = second.copy()
+        self.assertEqual(net.update(second), (0,))
+        self.assertEqual(copy[0], 1)
+        self.assertEqual(net.evaluate(), (1,))
+        self.assertEqual(net.evaluate(), (1,))
+
+    def test_perceptron_weights(self):
+        a = model.Input("a")
+        b = model.Input("b")
+        p = model.Neuron((a, b), (0.5, 0.25), 0.7)
+        net = compiled.CompiledNetwork(model.Network(p))
+        self.assertEqual(net.evaluate(a=1, b=0), (0,))
+        self.assertEqual(net.evaluate(a=1, b=1), (1,))
+
+    def test_wide_perceptron(self):
+        rng = random.Random(0)
+        inputs = [model.Input("i%d" % index) for index in xrange(32)]
+        p = perceptron.Perceptron(inputs, [rng.uniform(-1, 1)
+                                           for dummy in inputs], 0.5)
+        reference = model.Network(p)
+        net = compiled.CompiledNetwork(reference)
+        state = net.state()
+        for dummy in xrange(20):
+            values = dict((input.name, rng.randint(0, 1))
+                          for input in inputs)
+            self.assertEqual(net.update(state, **values),
+                             reference.update(**values))
+
+    def test_threads_share_network(self):
+        cin = model.Input("cin")
+        a = model.Input("a")
+        b = model.Input("b")
+        net = compiled.CompiledNetwork(network.FullAdder(cin, a, b))
+        failures = []
+
+        def run(lane):
+            inputs = dict(cin=lane & 1, a=(lane >> 1) & 1, b=(lane >> 2) & 1)
+            total = inputs["cin"] + inputs["a"] + inputs["b"]
+            for dummy in xrange(2000):
+                state = net.local_state()
+                if net.update(state, **inputs) != (total & 1, total >> 1):
+                    failures.append(lane)
+                    return
+
+        threads = [threading.Thread(target=run, args=(lane,))
+                   for lane in xrange(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(failures, [])
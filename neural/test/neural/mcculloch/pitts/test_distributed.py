@@ -0,0 +1,151 @@
+# McCulloch-Pitts neuron model
+#
+# Evan Leis, 2015
+
+# Make sure things behave like expected
+
+import random
+import threading
+import unittest
+from multiprocessing.connection import Listener
+
+from neural.mcculloch.pitts import compiled, distributed, model, perceptron
+
+
+def random_network(rng, inputs=8, neurons=200, feedback=20):
+    """
+    Network of random gates, some of them also reading later gates.
+    """
+    nodes = [model.Input("i%d" % index) for index in xrange(inputs)]
+    gates = []
+    kinds = [model.AndNeuron, model.OrNeuron, model.NandNeuron]
+    for dummy in xrange(neurons):
+        if rng.random() < 0.1:
+            gate = model.NotNeuron(rng.choice(nodes))
+        else:
+            gate = rng.choice(kinds)(rng.choice(nodes), rng.choice(nodes))
+        nodes.append(gate)
+        gates.append(gate)
+    for dummy in xrange(feedback):
+        gate = rng.choice(gates)
+        gate.inputs = (gate.inputs[0], rng.choice(gates))
+        gate.weights = [gate.weights[0], gate.weights[0]]
+    return model.Network(*gates[-10:])
+
+
+def random_inputs(rng, count=8):
+    return dict(("i%d" % index, rng.randint(0, 1)) for index in xrange(count))
+
+
+class LevelsTestCase(unittest.TestCase):
+    def test_levels(self):
+        a = model.Input("a")
+        b = model.Input("b")
+        first = model.AndNeuron(a, b)
+        second = model.NotNeuron(first)
+        net = compiled.CompiledNetwork(model.Network(second))
+        self.assertEqual(distributed.levels(net), [0, 0, 1, 2])
+
+    def test_feedback_is_read_before_it_is_updated(self):
+        a = model.Input("a")
+        reader = model.AndNeuron(a, None)
+        source = model.NotNeuron(model.NotNeuron(reader))
+        reader.inputs = (a, source)
+        net = compiled.CompiledNetwork(model.Network(source))
+        self.assertEqual(list(net.nodes)[1:], [reader, source.inputs[0],
+                                               source])
+        level = distributed.levels(net)
+        self.assertEqual(level, [0, 1, 2, 3])
+
+        other = model.NotNeuron(a)
+        reader.inputs = (other, source)
+        net = compiled.CompiledNetwork(model.Network(other, source))
+        level = distributed.levels(net)
+        self.assertEqual(level[net.index(reader)], 2)
+        self.assertEqual(level[net.index(source)], 4)
+
+
+class PartitionTestCase(unittest.TestCase):
+    def test_balanced(self):
+        net = compiled.CompiledNetwork(random_network(random.Random(0)))
+        partitioning = distributed.partition(net, 4)
+        sizes = partitioning.sizes
+        self.assertEqual(sum(sizes), len(net.gates))
+        self.assertTrue(max(sizes) - min(sizes) <= max(partitioning.levels))
+
+    def test_independent_chains_are_not_cut(self):
+        chains = []
+        for index in xrange(4):
+            gate = model.Input("i%d" % index)
+            for dummy in xrange(10):
+                gate = model.NotNeuron(gate)
+            chains.append(gate)
+        net = compiled.CompiledNetwork(model.Network(*chains))
+        partitioning = distributed.partition(net, 4)
+        self.assertEqual(partitioning.cut, 0)
+        self.assertEqual(partitioning.sizes, [10, 10, 10, 10])
+
+
+class DistributedNetworkTestCase(unittest.TestCase):
+    def check(self, worker, partitions=3, updates=20):
+        rng = random.Random(1)
+        net = random_network(rng)
+        with distributed.DistributedNetwork(net, partitions,
+                                            worker=worker) as dist:
+            for dummy in xrange(updates):
+                inputs = random_inputs(rng)
+                self.assertEqual(dist.update(**inputs), net.update(**inputs))
+            for slot, node in enumerate(dist.network.nodes):
+                if dist.readers[slot]:
+                    self.assertEqual(dist.values[slot], node.state)
+            return dist
+
+    def test_local_workers(self):
+        dist = self.check(distributed.LocalWorker)
+        self.assertEqual(len(dist.stats), 3)
+        for stats in dist.stats:
+            self.assertTrue(stats.messages > 0)
+            self.assertTrue(stats.received > 0)
+        self.assertEqual(sum(stats.gates for stats in dist.stats),
+                         len(dist.network.gates))
+
+    def test_oscillator(self):
+        a = model.NotNeuron(None, state=0)
+        a.inputs = [a]
+        dist = distributed.DistributedNetwork(model.Network(a))
+        self.assertEqual([dist.update() for dummy in xrange(3)],
+                         [(1,), (0,), (1,)])
+        self.assertEqual(a.state, 0)
+
+    def test_wide_perceptron(self):
+        rng = random.Random(2)
+        inputs = [model.Input("i%d" % index) for index in xrange(32)]
+        p = perceptron.Perceptron(inputs, [rng.uniform(-1, 1)
+                                           for dummy in inputs], 0.5)
+        net = model.Network(model.NotNeuron(p), p)
+        dist = distributed.DistributedNetwork(net)
+        for dummy in xrange(10):
+            values = random_inputs(rng, 32)
+            self.assertEqual(dist.update(**values), net.update(**values))
+
+    def test_no_partitions(self):
+        net = compiled.CompiledNetwork(random_network(random.Random(0)))
+        with self.assertRaises(ValueError):
+            distributed.partition(net, 0)
+
+    def test_process_workers(self):
+        self.check(distributed.ProcessWorker, partitions=2, updates=5)
+
+    def test_remote_workers(self):
+        listener = Listener(("localhost", 0), authkey="secret")
+        server = threading.Thread(target=distributed.serve,
+                                  args=(listener, 2))
+        server.daemon = True
+        server.start()
+        try:
+            self.check(lambda program: distributed.RemoteWorker(
+                program, listener.address, authkey="secret"),
+                partitions=2, updates=5)
+        finally:
+            server.join()
+            listener.close()
@@ -0,0 +1,141 @@
+# McCulloch-Pitts neuron model
+#
+# Evan Leis, 2015
+
+# Make sure things behave like expected
+
+import unittest
+
+from neural.mcculloch.pitts import equivalence, model, network
+
+
+def ripple_adder(bits, xor=network.XorNetwork.build_net):
+    """
+    `bits`-bit ripple-carry adder, with `xor` used for the sum bits.
+    """
+    carry = model.Input("c")
+    outputs = []
+    for bit in xrange(bits):
+        a = model.Input("a%d" % bit)
+        b = model.Input("b%d" % bit)
+        half = xor(a, b)[0]
+        outputs.append(xor(half, carry)[0])
+        carry = model.OrNeuron(model.AndNeuron(half, carry),
+                               model.AndNeuron(a, b))
+    outputs.append(carry)
+    return model.Network(*outputs)
+
+
+def nand_xor(a, b):
+    nand = model.NandNeuron(a, b)
+    return model.NandNeuron(model.NandNeuron(a, nand),
+                            model.NandNeuron(b, nand)),
+
+
+def broken_xor(a, b):
+    return model.OrNeuron(a, b),
+
+
+def add(bits):
+    def reference(c, **inputs):
+        a = sum(inputs["a%d" % bit] << bit for bit in xrange(bits))
+        b = sum(inputs["b%d" % bit] << bit for bit in xrange(bits))
+        total = a + b + c
+        return tuple((total >> bit) & 1 for bit in xrange(bits + 1))
+    return reference
+
+
+class ExhaustiveLanesTestCase(unittest.TestCase):
+    def test_lanes(self):
+        self.assertEqual(equivalence.exhaustive_lanes(0, 8), 0xaa)
+        self.assertEqual(equivalence.exhaustive_lanes(1, 8), 0xcc)
+        self.assertEqual(equivalence.exhaustive_lanes(2, 8), 0xf0)
+        self.assertEqual(equivalence.exhaustive_lanes(3, 8), 0)
+
+
+class CheckTestCase(unittest.TestCase):
+    def test_equivalent_networks(self):
+        result = equivalence.check(ripple_adder(4),
+                                   ripple_adder(4, xor=nand_xor))
+        self.assertTrue(result)
+        self.assertTrue(result.exhaustive)
+        self.assertEqual(result.vectors, 1 << 9)
+
+    def test_batches_cover_every_assignment(self):
+        result = equivalence.check(ripple_adder(4), add(4), batch_size=16)
+        self.assertTrue(result)
+        self.assertEqual(result.vectors, 1 << 9)
+
+    def test_batches_of_any_size(self):
+        inputs = [model.Input("i%d" % index) for index in xrange(8)]
+        gate = inputs[0]
+        for input in inputs[1:]:
+            gate = model.AndNeuron(gate, input)
+        for batch_size in (100, 96, 1 << 16):
+            result = equivalence.check(model.Network(gate),
+                                       lambda **inputs: (0,),
+                                       batch_size=batch_size)
+            self.assertTrue(result.exhaustive)
+            self.assertEqual(result.vectors, 1 << 8)
+            self.assertEqual(len(result.counterexamples), 1)
+            self.assertEqual(result.counterexamples[0].inputs,
+                             dict(("i%d" % index, 1) for index in xrange(8)))
+
+        with self.assertRaises(ValueError):
+            equivalence.check(model.Network(gate), lambda **inputs: (0,),
+                              batch_size=0)
+
+    def test_no_samples(self):
+        inputs = [model.Input("i%d" % index) for index in xrange(30)]
+        gate = model.Neuron(inputs, [1] * 30, 30)
+        with self.assertRaises(ValueError):
+            equivalence.check(model.Network(gate), lambda **inputs: (1,),
+                              samples=0)
+
+    def test_counterexamples(self):
+        result = equivalence.check(ripple_adder(2, xor=broken_xor), add(2),
+                                   max_counterexamples=3)
+        self.assertFalse(result)
+        self.assertEqual(len(result.counterexamples), 3)
+        reference = add(2)
+        for counterexample in result.counterexamples:
+            self.assertEqual(counterexample.expected,
+                             reference(**counterexample.inputs))
+            self.assertNotEqual(counterexample.actual,
+                                counterexample.expected)
+
+    def test_bitwise_reference(self):
+        a = model.Input("a")
+        b = model.Input("b")
+        result = equivalence.check(network.HalfAdder(a, b),
+                                   lambda a, b: (a ^ b, a & b), bitwise=True)
+        self.assertTrue(result)
+
+        result = equivalence.check(network.HalfAdder(a, b),
+                                   lambda a, b: (~(a ^ b), a & b),
+                                   bitwise=True)
+        self.assertEqual(len(result.counterexamples), 4)
+
+    def test_random_sampling(self):
+        result = equivalence.check(ripple_adder(32),
+                                   ripple_adder(32, xor=nand_xor),
+                                   samples=5000, batch_size=1024)
+        self.assertTrue(result)
+        self.assertFalse(result.exhaustive)
+        self.assertEqual(result.vectors, 5000)
+
+    def test_random_sampling_is_seeded(self):
+        broken = ripple_adder(32, xor=broken_xor)
+        first = equivalence.check(broken, add(32), samples=64, seed=3)
+        second = equivalence.check(broken, add(32), samples=64, seed=3)
+        self.assertFalse(first)
+        self.assertEqual([c.inputs for c in first.counterexamples],
+                         [c.inputs for c in second.counterexamples])
+
+    def test_mismatched_inputs(self):
+        a = model.Input("a")
+        b = model.Input("b")
+        c = model.Input("c")
+        with self.assertRaises(ValueError):
+            equivalence.check(model.Network(model.AndNeuron(a, b)),
+                              model.Network(model.AndNeuron(a, c)))
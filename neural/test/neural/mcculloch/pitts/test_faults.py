@@ -0,0 +1,99 @@
+# McCulloch-Pitts neuron model
+#
+# Evan Leis, 2015
+
+# Make sure things behave like expected
+
+import unittest
+
+from neural.mcculloch.pitts import faults, model, network
+
+
+def detects(net, fault, inputs):
+    """
+    Whether `inputs` detect `fault`, found by mutating the network the hard
+    way.
+    """
+    good = net.update(**inputs)
+    if isinstance(fault, faults.StuckAt):
+        node = fault.node
+        if isinstance(node, model.Neuron):
+            node.update = lambda: setattr(node, "state", fault.value)
+            bad = net.update(**inputs)
+            del node.update
+        else:
+            bad = net.update(**dict(inputs, **{node.name: fault.value}))
+    else:
+        weight = fault.neuron.weights[fault.index]
+        fault.neuron.weights[fault.index] = fault.weight
+        bad = net.update(**inputs)
+        fault.neuron.weights[fault.index] = weight
+    return good != bad
+
+
+class SimulateTestCase(unittest.TestCase):
+    def full_adder(self):
+        return network.FullAdder(model.Input("cin"), model.Input("a"),
+                                 model.Input("b"))
+
+    def test_matrix_matches_mutation(self):
+        adder = self.full_adder()
+        all_faults = (faults.stuck_at_faults(adder, inputs=True) +
+                      faults.weight_faults(adder))
+        vectors = faults.exhaustive_vectors(["cin", "a", "b"])
+        report = faults.simulate(adder, all_faults, vectors, drop=False)
+        self.assertEqual(report.vectors, 8)
+        for index, fault in enumerate(all_faults):
+            for vector, inputs in enumerate(vectors):
+                self.assertEqual(report.detects(index, vector),
+                                 detects(adder, fault, inputs),
+                                 "%r on %r" % (fault, inputs))
+
+    def test_drop_keeps_first_detection(self):
+        adder = self.full_adder()
+        all_faults = faults.stuck_at_faults(adder)
+        full = faults.simulate(adder, all_faults, drop=False)
+        dropped = faults.simulate(adder, all_faults)
+        for row, first in zip(full.matrix, dropped.matrix):
+            self.assertEqual(first, row & -row)
+        self.assertEqual(dropped.coverage, full.coverage)
+
+    def test_coverage(self):
+        a = model.Input("a")
+        b = model.Input("b")
+        gate = model.OrNeuron(a, b)
+        # the second AND input is redundant, stuck at 1 it changes nothing
+        net = model.Network(model.AndNeuron(gate, model.OrNeuron(gate, b)))
+        report = faults.simulate(net, faults.stuck_at_faults(net))
+        self.assertEqual(len(report.faults), 6)
+        self.assertEqual(report.coverage, 5.0 / 6)
+        self.assertEqual([(f.node.inputs, f.value) for f in report.undetected],
+                         [((gate, b), 1)])
+
+    def test_network_is_left_alone(self):
+        adder = self.full_adder()
+        states = [node.state for node in adder]
+        weights = [list(node.weights) for node in adder
+                   if isinstance(node, model.Neuron)]
+        faults.simulate(adder, faults.stuck_at_faults(adder) +
+                        faults.weight_faults(adder))
+        self.assertEqual([node.state for node in adder], states)
+        self.assertEqual([list(node.weights) for node in adder
+                          if isinstance(node, model.Neuron)], weights)
+
+    def test_vectors_from_an_iterator(self):
+        adder = self.full_adder()
+        all_faults = faults.stuck_at_faults(adder)
+        vectors = faults.exhaustive_vectors(["cin", "a", "b"])
+        report = faults.simulate(adder, all_faults, iter(vectors),
+                                 drop=False)
+        self.assertEqual(report.vectors, 8)
+        self.assertEqual(report.matrix,
+                         faults.simulate(adder, all_faults, vectors,
+                                         drop=False).matrix)
+
+    def test_too_many_inputs(self):
+        inputs = [model.Input("i%d" % index) for index in xrange(4)]
+        net = model.Network(*inputs)
+        with self.assertRaises(ValueError):
+            faults.simulate(net, [], exhaustive_limit=3)
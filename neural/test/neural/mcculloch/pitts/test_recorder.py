@@ -0,0 +1,125 @@
+# McCulloch-Pitts neuron model
+#
+# Evan Leis, 2015
+
+# Make sure things behave like expected
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from neural.mcculloch.pitts import compiled, model, network, recorder
+
+
+def oscillator():
+    a = model.NotNeuron(None, state=0)
+    a.inputs = [a]
+    return a, model.Network(a)
+
+
+class RecorderTestCase(unittest.TestCase):
+    def test_history(self):
+        a, net = oscillator()
+        rec = recorder.Recorder(net, 16)
+        for dummy in xrange(5):
+            rec.update()
+        self.assertEqual(len(rec), 5)
+        self.assertEqual(rec.history(a), [1, 0, 1, 0, 1])
+        self.assertEqual(rec.history(a, 1, 3), [0, 1])
+
+    def test_window(self):
+        cin = model.Input("cin")
+        a = model.Input("a")
+        b = model.Input("b")
+        adder = network.FullAdder(cin, a, b)
+        rec = recorder.Recorder(adder, 8)
+        rec.update(cin=1, a=1, b=0)
+        rec.update(cin=0, a=0, b=1)
+        vectors = rec.window()
+        self.assertEqual(len(vectors), 2)
+        self.assertEqual(len(vectors[0]), len(adder))
+        self.assertEqual(vectors[1], tuple(node.state for node in adder))
+        self.assertEqual(rec.history("cin"), [1, 0])
+        self.assertEqual(rec.history(adder.carry), [1, 0])
+        self.assertEqual(rec.window(1), vectors[1:])
+
+    def test_ring_buffer_keeps_latest_steps(self):
+        a, net = oscillator()
+        rec = recorder.Recorder(net, 3)
+        for dummy in xrange(10):
+            rec.update()
+        self.assertEqual(rec.time, 10)
+        self.assertEqual(len(rec), 3)
+        self.assertEqual(rec.first, 7)
+        self.assertEqual(rec.history(a), [0, 1, 0])
+        self.assertEqual(rec.history(a, 0, 8), [0])
+        self.assertEqual(rec.window(8, 9), [(1,)])
+
+    def test_wide_network(self):
+        inputs = [model.Input("i%d" % index) for index in xrange(21)]
+        rec = recorder.Recorder(model.Network(*inputs), 4)
+        values = [index % 3 == 0 for index in xrange(21)]
+        rec.record([int(value) for value in values])
+        self.assertEqual(rec.row, 3)
+        self.assertEqual(rec.window(), [tuple(int(v) for v in values)])
+        self.assertEqual(rec.history("i3"), [1])
+        self.assertEqual(rec.history(inputs[20]), [0])
+
+    def test_compiled_state(self):
+        a = model.Input("a")
+        b = model.Input("b")
+        gate = model.OrNeuron(a, b)
+        net = compiled.CompiledNetwork(model.Network(gate))
+        state = net.state()
+        rec = recorder.Recorder(net, 4)
+        net.update(state, a=0, b=1)
+        rec.record(state.values)
+        self.assertEqual(rec.window(), [(0, 1, 1)])
+        self.assertEqual(rec.history(gate), [1])
+
+    def test_compiled_update(self):
+        a = model.Input("a")
+        b = model.Input("b")
+        gate = model.AndNeuron(a, b)
+        net = compiled.CompiledNetwork(model.Network(gate))
+        rec = recorder.Recorder(net, 4)
+        self.assertEqual(rec.update(a=1, b=1), (1,))
+        self.assertEqual(rec.update(a=1, b=0), (0,))
+        self.assertEqual(rec.window(), [(1, 1, 1), (1, 0, 0)])
+        self.assertEqual(rec.state[gate], 0)
+        self.assertEqual(gate.state, 0)
+
+    def test_compiled_record(self):
+        a = model.Input("a")
+        b = model.Input("b")
+        gate = model.OrNeuron(a, b)
+        net = compiled.CompiledNetwork(model.Network(gate))
+        state = net.state()
+        rec = recorder.Recorder(net, 4, state=state)
+        net.update(state, a=1, b=0)
+        rec.record()
+        self.assertEqual(rec.window(), [(1, 0, 1)])
+        with self.assertRaises(ValueError):
+            recorder.Recorder(model.Network(gate), 4, state=state)
+
+    def test_record_checks_width(self):
+        a, net = oscillator()
+        rec = recorder.Recorder(net, 4)
+        with self.assertRaises(ValueError):
+            rec.record([0, 1])
+
+    def test_memory_mapped_file(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "states")
+            a, net = oscillator()
+            with recorder.Recorder(net, 4, path=path) as rec:
+                for dummy in xrange(6):
+                    rec.update()
+                rec.flush()
+                self.assertEqual(os.path.getsize(path), 4)
+                self.assertEqual(rec.history(a), [1, 0, 1, 0])
+                self.assertEqual(rec.window(5), [(0,)])
+        finally:
+            shutil.rmtree(directory)
@@ -0,0 +1,110 @@
+# McCulloch-Pitts neuron model
+#
+# Evan Leis, 2015
+
+# Make sure things behave like expected
+
+import random
+import unittest
+
+from neural.mcculloch.pitts import model, network, template
+
+
+def ripple_adder(bits):
+    adder = template.Template(network.FullAdder.build_net, "cin", "a", "b")
+    circuit = template.Circuit()
+    carry = circuit.input("c")
+    for bit in xrange(bits):
+        stage = circuit.instantiate(adder, carry, "a%d" % bit, "b%d" % bit)
+        circuit.outputs.append(stage[0])
+        carry = stage[1]
+    circuit.outputs.append(carry)
+    return circuit
+
+
+def add(bits, a, b, c):
+    inputs = dict(c=c)
+    for bit in xrange(bits):
+        inputs["a%d" % bit] = (a >> bit) & 1
+        inputs["b%d" % bit] = (b >> bit) & 1
+    return inputs, tuple(((a + b + c) >> bit) & 1 for bit in xrange(bits + 1))
+
+
+class TemplateTestCase(unittest.TestCase):
+    def test_template(self):
+        xor = template.Template(network.XorNetwork.build_net, "a", "b")
+        self.assertEqual(xor.ports, ("a", "b"))
+        self.assertEqual(len(xor.network.outputs), 1)
+
+    def test_unused_ports(self):
+        first = template.Template(lambda a, b: (model.NotNeuron(a),), "a", "b")
+        self.assertEqual(first.used, ((0, "a"),))
+
+
+class CircuitTestCase(unittest.TestCase):
+    def test_ripple_adder(self):
+        circuit = ripple_adder(16)
+        self.assertEqual(len(circuit), 16)
+        self.assertEqual(len(circuit.levels), 16)
+        rng = random.Random(0)
+        for dummy in xrange(50):
+            inputs, expected = add(16, rng.getrandbits(16),
+                                   rng.getrandbits(16), rng.randint(0, 1))
+            self.assertEqual(circuit.update(**inputs), expected)
+
+    def test_instances_share_levels(self):
+        half = template.Template(network.HalfAdder.build_net, "a", "b")
+        circuit = template.Circuit()
+        stages = [circuit.instantiate(half, "a%d" % bit, "b%d" % bit)
+                  for bit in xrange(100)]
+        self.assertEqual(len(circuit.levels), 1)
+        self.assertEqual(len(circuit.levels[0]), 1)
+        circuit.outputs = [stage[index] for stage in stages
+                           for index in (0, 1)]
+        inputs = {}
+        expected = []
+        for bit in xrange(100):
+            a, b = bit % 2, (bit // 2) % 2
+            inputs["a%d" % bit] = a
+            inputs["b%d" % bit] = b
+            expected.extend([a ^ b, a & b])
+        self.assertEqual(circuit.update(**inputs), tuple(expected))
+
+    def test_instance_states(self):
+        half = template.Template(network.HalfAdder.build_net, "a", "b")
+        reference = network.HalfAdder(model.Input("a"), model.Input("b"))
+        circuit = template.Circuit()
+        first = circuit.instantiate(half, "a", "b")
+        second = circuit.instantiate(half, "b", "a")
+        circuit.update(a=1, b=0)
+        reference.update(a=1, b=0)
+        expected = tuple(node.state for node in reference)
+        self.assertEqual(first.states(), expected)
+        self.assertEqual(second.states()[:2], (0, 1))
+        self.assertEqual(circuit.state(first[1]), 0)
+
+    def test_instances_keep_their_own_state(self):
+        def oscillator(a):
+            gate = model.NotNeuron(None)
+            gate.inputs = [gate]
+            return gate, model.AndNeuron(gate, a)
+
+        blink = template.Template(oscillator, "a")
+        circuit = template.Circuit()
+        first = circuit.instantiate(blink, "a")
+        circuit.update(a=1)
+        second = circuit.instantiate(blink, "a")
+        circuit.outputs = [first[0], second[0]]
+        self.assertEqual(circuit.update(), (0, 1))
+        self.assertEqual(circuit.update(), (1, 0))
+
+    def test_checks_ports(self):
+        half = template.Template(network.HalfAdder.build_net, "a", "b")
+        circuit = template.Circuit()
+        with self.assertRaises(ValueError):
+            circuit.instantiate(half, "a")
+        stage = circuit.instantiate(half, "a", "b")
+        with self.assertRaises(IndexError):
+            stage[2]
+        with self.assertRaises(KeyError):
+            circuit.update(c=1)
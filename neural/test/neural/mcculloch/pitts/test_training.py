@@ -0,0 +1,263 @@
+# McCulloch-Pitts neuron model
+#
+# Evan Leis, 2015
+
+# Make sure things behave like expected
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from neural.mcculloch.pitts import model, perceptron, training
+
+
+def and_samples(count, seed=0):
+    """
+    Samples of 4 inputs, expected to fire iff the first two are on.
+    """
+    rng = random.Random(seed)
+    for dummy in xrange(count):
+        inputs = tuple(rng.randint(0, 1) for dummy in xrange(4))
+        yield inputs, 1 if inputs[0] and inputs[1] else 0
+
+
+def new_perceptron():
+    inputs = [model.Input(name) for name in "abcd"]
+    return perceptron.Perceptron(inputs, (0, 0, 0, 0), 1)
+
+
+class HelpersTestCase(unittest.TestCase):
+    def test_chunks(self):
+        self.assertEqual(list(training.chunks(xrange(5), 2)),
+                         [[0, 1], [2, 3], [4]])
+
+    def test_shuffled_is_a_permutation(self):
+        samples = list(xrange(100))
+        result = list(training.shuffled(samples, 10, random.Random(1)))
+        self.assertEqual(sorted(result), samples)
+        self.assertNotEqual(result, samples)
+
+    def test_read_samples(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "samples")
+            with open(path, "w") as source:
+                source.write("# a b expected\n1 0 0\n\n1 0.5 1\n")
+            self.assertEqual(list(training.read_samples(path)),
+                             [((1, 0), 0), ((1, 0.5), 1)])
+        finally:
+            shutil.rmtree(directory)
+
+
+class StreamTrainerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_matches_perceptron_train(self):
+        p = new_perceptron()
+        net = model.Network(p)
+        for inputs, expected in and_samples(500):
+            net.update(**dict(zip("abcd", inputs)))
+            p.train(expected, 0.25)
+
+        streamed = new_perceptron()
+        trainer = training.StreamTrainer(streamed, 0.25, chunk_size=64)
+        stats = []
+        samples, errors = trainer.train(and_samples(500),
+                                        report=stats.append)
+        self.assertEqual(streamed.weights, p.weights)
+        self.assertEqual(samples, 500)
+        self.assertEqual(len(stats), 8)
+        self.assertEqual(sum(s.errors for s in stats), errors)
+        self.assertEqual(stats[-1].errors, 0)
+        self.assertEqual(stats[-1].change, 0)
+
+    def test_converges_over_epochs(self):
+        p = new_perceptron()
+        trainer = training.StreamTrainer(p, 0.25, chunk_size=16,
+                                         shuffle_buffer=8, seed=3)
+        stats = []
+        trainer.train(lambda: and_samples(64), epochs=5, report=stats.append)
+        self.assertEqual(stats[-1].epoch, 4)
+        self.assertEqual(stats[-1].error_rate, 0.0)
+        net = model.Network(p)
+        for inputs, expected in and_samples(16, seed=1):
+            self.assertEqual(net.update(**dict(zip("abcd", inputs))),
+                             (expected,))
+
+    def test_file_source(self):
+        path = os.path.join(self.directory, "samples")
+        with open(path, "w") as source:
+            for inputs, expected in and_samples(200):
+                source.write("%s %d\n" % (" ".join(map(str, inputs)),
+                                          expected))
+        p = new_perceptron()
+        trainer = training.StreamTrainer(p, 0.25)
+        stats = []
+        self.assertEqual(trainer.train(path, epochs=2, report=stats.append),
+                         (400, sum(s.errors for s in stats)))
+        self.assertEqual(stats[-1].errors, 0)
+
+    def test_epochs_need_a_replayable_source(self):
+        trainer = training.StreamTrainer(new_perceptron(), 0.25)
+        with self.assertRaises(ValueError):
+            trainer.train(and_samples(10), epochs=2)
+
+    def test_empty_chunks(self):
+        with self.assertRaises(ValueError):
+            training.StreamTrainer(new_perceptron(), 0.25, chunk_size=0)
+
+    def test_no_checkpoint_interval(self):
+        with self.assertRaises(ValueError):
+            training.StreamTrainer(new_perceptron(), 0.25,
+                                   checkpoint_every=0)
+
+    def test_resume_from_checkpoint(self):
+        def source():
+            return and_samples(100)
+
+        uninterrupted = new_perceptron()
+        training.StreamTrainer(uninterrupted, 0.1, chunk_size=10,
+                               shuffle_buffer=20).train(source, epochs=3)
+
+        checkpoint = os.path.join(self.directory, "checkpoint")
+
+        class Interrupt(Exception):
+            pass
+
+        def interrupt(stats):
+            if stats.epoch == 1 and stats.chunk == 5:
+                raise Interrupt()
+
+        first = new_perceptron()
+        trainer = training.StreamTrainer(
+            first, 0.1, chunk_size=10, shuffle_buffer=20,
+            checkpoint=checkpoint, checkpoint_every=2)
+        with self.assertRaises(Interrupt):
+            trainer.train(source, epochs=3, report=interrupt)
+
+        resumed = new_perceptron()
+        stats = []
+        trainer = training.StreamTrainer(
+            resumed, 0.1, chunk_size=10, shuffle_buffer=20,
+            checkpoint=checkpoint, checkpoint_every=2)
+        samples, errors = trainer.train(source, epochs=3, report=stats.append)
+        self.assertEqual((stats[0].epoch, stats[0].chunk), (1, 4))
+        self.assertEqual(samples, 160)
+        self.assertEqual(resumed.weights, uninterrupted.weights)
+
+    def test_resume_after_last_epoch(self):
+        checkpoint = os.path.join(self.directory, "checkpoint")
+        p = new_perceptron()
+        trainer = training.StreamTrainer(p, 0.1, checkpoint=checkpoint)
+        self.assertEqual(trainer.train(lambda: and_samples(50), epochs=2)[0],
+                         100)
+        weights = list(p.weights)
+
+        resumed = new_perceptron()
+        trainer = training.StreamTrainer(resumed, 0.1, checkpoint=checkpoint)
+        self.assertEqual(trainer.train(lambda: and_samples(50), epochs=2),
+                         (0, 0))
+        self.assertEqual(resumed.weights, weights)
+        self.assertEqual(trainer.train(lambda: and_samples(50), epochs=3)[0],
+                         50)
+
+    def test_resume_from_shorter_source(self):
+        checkpoint = os.path.join(self.directory, "checkpoint")
+
+        def stop(stats):
+            if stats.chunk == 3:
+                raise KeyboardInterrupt()
+
+        trainer = training.StreamTrainer(new_perceptron(), 0.1, chunk_size=10,
+                                         checkpoint=checkpoint,
+                                         checkpoint_every=2)
+        with self.assertRaises(KeyboardInterrupt):
+            trainer.train(lambda: and_samples(100), epochs=2, report=stop)
+        with self.assertRaises(ValueError) as raised:
+            trainer.train(lambda: and_samples(15), epochs=2)
+        self.assertIn(checkpoint, str(raised.exception))
+
+
+def train_alone(p, samples, learning_rate, columns="abcd", epochs=1):
+    net = model.Network(p)
+    names = [input.name for input in p.inputs]
+    errors = 0
+    for dummy in xrange(epochs):
+        for inputs, expected in samples:
+            values = dict(zip(columns, inputs))
+            state, = net.update(**dict((name, values[name])
+                                       for name in names))
+            errors += state != expected
+            p.train(expected, learning_rate)
+    return errors
+
+
+class MultiTrainerTestCase(unittest.TestCase):
+    def test_grid_matches_individual_training(self):
+        samples = list(and_samples(300))
+        rates = [0.05, 0.1, 0.25, 0.5]
+        trainer = training.MultiTrainer.grid(new_perceptron(), rates)
+        errors = trainer.train(samples, epochs=2)
+        for rate, p, model_errors in zip(rates, trainer.perceptrons, errors):
+            alone = new_perceptron()
+            self.assertEqual(train_alone(alone, samples, rate, epochs=2),
+                             model_errors)
+            self.assertEqual(p.weights, alone.weights)
+        self.assertEqual(trainer.weights,
+                         [p.weights for p in trainer.perceptrons])
+
+    def test_grid_of_generated_rates(self):
+        trainer = training.MultiTrainer.grid(
+            new_perceptron(), (0.05 * k for k in xrange(1, 4)))
+        self.assertEqual(len(trainer.perceptrons), 3)
+        self.assertEqual(trainer.learning_rates,
+                         [0.05 * k for k in xrange(1, 4)])
+
+    def test_feature_subsets(self):
+        samples = list(and_samples(300))
+        inputs = dict((name, model.Input(name)) for name in "abcd")
+        subsets = ["ab", "bcd", "ad", "abcd"]
+        perceptrons = [
+            perceptron.Perceptron([inputs[name] for name in subset],
+                                  [0] * len(subset), 1)
+            for subset in subsets]
+        trainer = training.MultiTrainer(perceptrons, 0.25, columns="abcd")
+        errors = trainer.train(samples)
+        for subset, p, model_errors in zip(subsets, perceptrons, errors):
+            alone = perceptron.Perceptron(
+                [model.Input(name) for name in subset], [0] * len(subset), 1)
+            self.assertEqual(train_alone(alone, samples, 0.25), model_errors)
+            self.assertEqual(p.weights, alone.weights)
+
+    def test_processes(self):
+        samples = list(and_samples(200))
+        rates = [0.05, 0.1, 0.25, 0.5, 1.0]
+        serial = training.MultiTrainer.grid(new_perceptron(), rates)
+        parallel = training.MultiTrainer.grid(new_perceptron(), rates)
+        self.assertEqual(parallel.train(samples, processes=2),
+                         serial.train(samples))
+        self.assertEqual(parallel.weights, serial.weights)
+
+    def test_iterator_of_samples(self):
+        samples = list(and_samples(100))
+        rates = [0.1, 0.25]
+        trainer = training.MultiTrainer.grid(new_perceptron(), rates)
+        expected = trainer.train(samples)
+        for processes in (None, 2):
+            trainer = training.MultiTrainer.grid(new_perceptron(), rates)
+            self.assertEqual(trainer.train(iter(samples),
+                                           processes=processes), expected)
+        with self.assertRaises(ValueError):
+            trainer.train(and_samples(100), epochs=3)
+
+    def test_checks_arguments(self):
+        with self.assertRaises(ValueError):
+            training.MultiTrainer([new_perceptron()], [0.1, 0.2])
+        with self.assertRaises(ValueError):
+            training.MultiTrainer([new_perceptron()], 0.1, columns="abc")